@@ -0,0 +1,310 @@
+"""
+Shared building blocks for the TechStore Assistant Streamlit app.
+Holds the cached resources, chat rendering and sidebar panels used by the entry point.
+"""
+
+import streamlit as st
+import os
+import uuid
+import itertools
+from types import MappingProxyType
+from typing import List
+import time
+from dotenv import load_dotenv
+from utils.semantic_cache import SemanticCache
+from utils.chat_history import ChatHistoryStore
+
+# Load environment variables before anything reads them
+load_dotenv()
+
+REQUIRED_ENV_VARS = (
+    "AZURE_OPENAI_API_KEY",
+    "AZURE_OPENAI_ENDPOINT", 
+    "AZURE_OPENAI_DEPLOYMENT_NAME",
+    "PINECONE_API_KEY",
+    "PINECONE_ENVIRONMENT"
+)
+
+# Environment variables don't change while the process runs; this module is imported once, unlike
+# app.py whose top level re-runs on every Streamlit rerun
+MISSING_ENV_VARS = tuple(var for var in REQUIRED_ENV_VARS if not os.getenv(var))
+
+# Number of most recent chat messages rendered individually; older ones are batched into one HTML block
+RECENT_MESSAGES = 20
+
+# Allowed users; defined here rather than in app.py, whose top level re-runs on every Streamlit rerun
+ALLOWED_USERS = ["dog", "cat", "fish", "bird"]
+ALLOWED_USERS_LC = frozenset(map(str.lower, ALLOWED_USERS))
+
+# Sidebar category choices mapped to catalog categories
+CATEGORY_MAP = MappingProxyType({"Phones": "phone", "Laptops": "laptop", "Tablets": "tablet"})
+
+# Quick suggestion buttons: (label, prompt sent to the chatbot)
+QUICK_SUGGESTIONS = (
+    ("📱 Find a phone", "I'm looking for a new smartphone. Can you recommend some options?"),
+    ("💻 Find a laptop", "I need a laptop for work and productivity. What would you recommend?"),
+    ("📱 Find a tablet", "I want a tablet for entertainment and productivity. Any suggestions?"),
+)
+
+# Stylesheet injected on every page
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "style.css")
+
+@st.cache_resource
+def _css():
+    """Load the stylesheet and wrap it in a style tag once per process."""
+    with open(CSS_PATH, encoding="utf-8") as f:
+        return f"<style>{f.read()}</style>"
+
+def inject_css():
+    """
+    Inject the app stylesheet.
+    
+    This must run on every full rerun: Streamlit removes elements that a rerun doesn't re-send.
+    Fragment reruns (chat turns, sidebar widgets) skip it.
+    """
+    st.html(_css())
+
+HEADER_HTML = '<h1 class="main-header">🛍️ TechStore Assistant</h1>'
+
+FOOTER_HTML = """
+<div style='text-align: center; color: #666;'>
+    <p>Powered by Azure OpenAI, Pinecone, and Langchain</p>
+    <p>Built with ❤️ using Streamlit</p>
+</div>
+"""
+
+def render_footer():
+    """Display the page footer."""
+    st.markdown("---")
+    st.html(FOOTER_HTML)
+
+@st.cache_resource
+def initialize_chatbot():
+    """Initialize the chatbot with caching."""
+    # Imported lazily so the login page doesn't pay for loading the Azure/Langchain SDKs
+    from utils.chatbot import ProductRecommendationChatbot
+    
+    try:
+        chatbot = ProductRecommendationChatbot()
+        # Answer confident matches from an in-process index instead of querying Pinecone
+        chatbot.vector_store.build_local_index()
+        return chatbot
+    except Exception as e:
+        st.error(f"Error initializing chatbot: {e}")
+        return None
+
+@st.cache_resource
+def initialize_vector_store():
+    """Initialize the vector store with caching."""
+    # Imported lazily so the login page doesn't pay for loading the Pinecone/OpenAI SDKs
+    from utils.vector_store import get_vector_store
+    
+    try:
+        # The chatbot uses the same instance, so the app holds a single set of API clients
+        return get_vector_store()
+    except Exception as e:
+        st.error(f"Error initializing vector store: {e}")
+        return None
+
+def embed_query(prompt: str) -> List[float]:
+    """Embed a query (the vector store's embedding cache serves repeated prompts), or [] on failure."""
+    vector_store = initialize_vector_store()
+    if vector_store is None:
+        return []
+    return vector_store._generate_embedding(prompt)
+
+@st.cache_resource
+def get_semantic_cache():
+    """Get the response cache shared by all sessions."""
+    return SemanticCache(max_entries=256, similarity_threshold=0.95, ttl_seconds=6 * 60 * 60)
+
+def _throttle(chunks, interval):
+    """Coalesce streamed chunks so the UI is updated at most once per interval (in seconds)."""
+    buffer = []
+    last_flush = time.monotonic()
+    for chunk in chunks:
+        buffer.append(chunk)
+        now = time.monotonic()
+        if now - last_flush >= interval:
+            yield "".join(buffer)
+            buffer = []
+            last_flush = now
+    if buffer:
+        yield "".join(buffer)
+
+def _drop_interrupted(chunks, status):
+    """Pass stream chunks through, recording in status["interrupted"] whether the stream was cut off."""
+    from utils.chatbot import STREAM_INTERRUPTED
+    
+    for chunk in chunks:
+        if chunk is STREAM_INTERRUPTED:
+            status["interrupted"] = True
+        else:
+            yield chunk
+
+def respond(chatbot, prompt):
+    """Render the chatbot response, serving repeated or near-duplicate prompts from cache."""
+    from utils.chatbot import ERROR_RESPONSE, NO_RESULTS_RESPONSE
+    
+    cache = get_semantic_cache()
+    status = {"interrupted": False}
+    
+    # The spinner covers the lookups and the wait for the first chunk, then gives way to the streamed text
+    with st.spinner("Thinking..."):
+        # Exact (normalized) prompt hit skips every network call
+        response = cache.get_exact(prompt)
+        embedding = None
+        if response is None:
+            # Semantic hit costs a single embedding call instead of the full chat round trip
+            embedding = embed_query(prompt)
+            response = cache.get_similar(embedding)
+            if response is not None:
+                cache.put(prompt, None, response)
+        
+        if response is None:
+            # The embedding computed for the cache lookup is reused for the product search; the chatbot
+            # embeds the message itself only if that failed
+            stream = chatbot.chat_stream(prompt, query_embedding=embedding or None)
+            # Flush to the UI every 100ms rather than per token
+            chunks = _throttle(_drop_interrupted(stream, status), 0.1)
+            first = next(chunks, None)
+    
+    if response is not None:
+        st.markdown(response)
+        return response
+    
+    # Stream the rest of the answer
+    response = st.write_stream(itertools.chain([first], chunks) if first is not None else iter(()))
+    
+    # Failed turns aren't cached: an empty embedding or "no results" may come from a transient
+    # API error, and caching it would serve that answer for the whole TTL; neither is a cut-off answer
+    if embedding and not status["interrupted"] and response not in (ERROR_RESPONSE, NO_RESULTS_RESPONSE):
+        cache.put(prompt, embedding, response)
+    return response
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_index_stats(_vector_store):
+    """Get Pinecone index stats, refreshed at most once a minute."""
+    return _vector_store.get_index_stats()
+
+def products_for(category):
+    """Get the precomputed product list for a category (all products if unknown)."""
+    # Imported lazily so the login page doesn't pay for building the catalog indexes
+    from data.products import PRODUCTS, PRODUCTS_BY_CATEGORY
+    
+    # A plain dict lookup; st.cache_data would pickle and copy the tuple on every rerun
+    return PRODUCTS_BY_CATEGORY.get(category, PRODUCTS)
+
+def display_product_card(product):
+    """Display a product card with formatted information."""
+    with st.container():
+        st.html(product.card_html)
+
+@st.cache_resource
+def get_chat_history():
+    """Get the on-disk chat history store shared by all sessions."""
+    return ChatHistoryStore(os.getenv("CHAT_HISTORY_DB", "chat_history.db"))
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_prerendered_bulk_html(session_id, upto):
+    """Get the pre-rendered HTML of a session's first `upto` messages."""
+    return get_chat_history().get_rendered_html(session_id, upto)
+
+def add_message(role, content):
+    """Append a message to the session's chat history."""
+    get_chat_history().append(st.session_state.session_id, role, content)
+
+def clear_messages():
+    """Remove the chat history from the session."""
+    session_id = st.session_state.pop("session_id", None)
+    if session_id:
+        # Dropping the id also keeps the cached HTML of the old history from being reused
+        get_chat_history().clear(session_id)
+
+@st.fragment
+def render_sidebar(chatbot, vector_store):
+    """Render the database status, quick actions and product browser as a sidebar fragment."""
+    # Database status
+    st.markdown("### 📊 Database Status")
+    stats = cached_index_stats(vector_store)
+    if stats:
+        st.write(f"**Total Products:** {stats.get('total_vector_count', 0)}")
+        st.write(f"**Index Dimension:** {stats.get('dimension', 0)}")
+    else:
+        st.warning("Database stats not available")
+    
+    # Quick actions
+    st.markdown("### ⚡ Quick Actions")
+    
+    if st.button("🔄 Populate Database"):
+        with st.spinner("Populating database with product data..."):
+            # Also rebuilds the local index, which the chatbot shares
+            vector_store.populate_index()
+            # Refresh only the stats shown in this fragment; the rest of the page is unaffected
+            cached_index_stats.clear()
+            st.success("Database populated successfully!")
+            st.rerun(scope="fragment")
+    
+    if st.button("🗑️ Clear Chat History"):
+        clear_messages()
+        chatbot.clear_memory()
+        st.success("Chat history cleared!")
+        st.rerun()
+    
+    # Product categories
+    st.markdown("### 📱 Browse Products")
+    category = st.selectbox(
+        "Select Category:",
+        ["All", *CATEGORY_MAP]
+    )
+    
+    products = products_for(CATEGORY_MAP.get(category))
+    
+    st.write(f"**{len(products)} products available**")
+    
+    # Show sample products
+    if st.checkbox("Show sample products"):
+        for product in products[:3]:
+            display_product_card(product)
+
+@st.fragment
+def render_chat(chatbot):
+    """Render the chat history, input and quick suggestions as a fragment so chat turns don't rerun the whole page."""
+    # Identify this session's chat history
+    session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+    
+    # Older messages are drawn as one cached HTML block, the most recent ones as chat messages
+    history = get_chat_history()
+    older = max(history.count(session_id) - RECENT_MESSAGES, 0)
+    if older:
+        st.html(cached_prerendered_bulk_html(session_id, older))
+    for message in history.get_messages(session_id, start=older):
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+    
+    # Placeholder so the current turn renders above the input and suggestions
+    current_turn = st.container()
+    
+    # Chat input
+    prompt = st.chat_input("Ask me about products, features, or recommendations...")
+    
+    # Quick suggestions are answered in this same fragment run, without a rerun
+    st.markdown("### 💡 Quick Suggestions")
+    for column, (label, suggestion) in zip(st.columns(len(QUICK_SUGGESTIONS)), QUICK_SUGGESTIONS):
+        with column:
+            if st.button(label):
+                prompt = suggestion
+    
+    if prompt:
+        with current_turn:
+            # Add user message to chat history
+            add_message("user", prompt)
+            with st.chat_message("user"):
+                st.markdown(prompt)
+            
+            # Get bot response
+            with st.chat_message("assistant"):
+                response = respond(chatbot, prompt)
+            
+            # Add assistant response to chat history
+            add_message("assistant", response)
@@ -3,7 +3,96 @@ Product catalog with sample data for phones, laptops, and tablets.
 Each product includes detailed specifications for better recommendation matching.
 """
 
-PRODUCTS = [
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional
+    ahocorasick = None
+
+from data.search_numba import build_token_table, match_all_tokens, tokenize
+
+# Fields that come from the catalog data itself (the rest are derived at import)
+_CATALOG_FIELDS = ("id", "name", "category", "brand", "price", "description", "specs", "features", "tags")
+
+@dataclass(frozen=True, eq=False)
+class Product:
+    """
+    An immutable catalog entry.
+    Attributes are stored in slots, so `product.price` is a fixed-offset load rather than a dict lookup;
+    `product["price"]` still works for older callers.
+    """
+    __slots__ = _CATALOG_FIELDS + ("search_blob", "top_features", "card_html")
+
+    id: str
+    name: str
+    category: str
+    brand: str
+    price: int
+    description: str
+    specs: Dict[str, Any]
+    features: Tuple[str, ...]
+    tags: Tuple[str, ...]
+    search_blob: str
+    top_features: str
+    card_html: str
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Product":
+        """Build a product from its catalog data, precomputing the derived text fields."""
+        features = tuple(data["features"])
+        tags = tuple(data["tags"])
+        top_features = ", ".join(features[:3])
+
+        # Lowercased searchable text, so keyword search doesn't re-lowercase every field per query
+        search_blob = " ".join([data["name"], data["description"], *features, *tags]).lower()
+
+        # Product card markup for the web UI; the catalog is static, so render it once
+        card_html = f"""
+    <div class="product-card">
+        <h4>{data['name']}</h4>
+        <p><strong>Brand:</strong> {data['brand']} | <strong>Price:</strong> ${data['price']}</p>
+        <p>{data['description']}</p>
+        <p><strong>Key Features:</strong> {top_features}</p>
+    </div>
+    """
+
+        # Intern the small fixed sets of category/brand strings so comparisons and lookups hit identity checks
+        return cls(
+            id=data["id"],
+            name=data["name"],
+            category=sys.intern(data["category"]),
+            brand=sys.intern(data["brand"]),
+            price=data["price"],
+            description=data["description"],
+            specs=data["specs"],
+            features=features,
+            tags=tags,
+            search_blob=search_blob,
+            top_features=top_features,
+            card_html=card_html,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the catalog fields as a plain dictionary."""
+        return {field: getattr(self, field) for field in _CATALOG_FIELDS}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __reduce__(self):
+        # The default slot-state restore would go through the frozen __setattr__
+        return (Product, tuple(getattr(self, field) for field in self.__slots__))
+
+_PRODUCT_DATA = [
     # Smartphones
     {
         "id": "phone_001",
@@ -239,23 +328,124 @@ PRODUCTS = [
     }
 ]
 
+PRODUCTS = tuple(Product.from_dict(data) for data in _PRODUCT_DATA)
+del _PRODUCT_DATA
+
+# Lookup indices, built in a single pass at import (the catalog never changes at runtime)
+PRODUCTS_BY_CATEGORY = {}
+_BY_ID = {}
+_BY_BRAND_LOWER = {}
+_TOKEN_INDEX = {}
+for _product in PRODUCTS:
+    _BY_ID[_product.id] = _product
+    PRODUCTS_BY_CATEGORY.setdefault(_product.category, []).append(_product)
+    _BY_BRAND_LOWER.setdefault(sys.intern(_product.brand.lower()), []).append(_product)
+    for _token in tokenize(_product.search_blob):
+        _TOKEN_INDEX.setdefault(_token, set()).add(_product.id)
+PRODUCTS_BY_CATEGORY = {category: tuple(products) for category, products in PRODUCTS_BY_CATEGORY.items()}
+_BY_BRAND_LOWER = {brand: tuple(products) for brand, products in _BY_BRAND_LOWER.items()}
+del _product, _token
+
+# Plain-text catalog listing, one section per category; the catalog is static, so build it once
+_CATALOG_SECTIONS = (("phone", "📱 Smartphones"), ("laptop", "💻 Laptops"), ("tablet", "📱 Tablets"))
+_catalog_lines = []
+for _category, _title in _CATALOG_SECTIONS:
+    _category_products = PRODUCTS_BY_CATEGORY.get(_category, ())
+    _catalog_lines.append(f"\n{_title} ({len(_category_products)} products):")
+    _catalog_lines.append("-" * 30)
+    _catalog_lines.extend(
+        f"• {product.name} - ${product.price} ({product.brand})" for product in _category_products
+    )
+CATALOG_SUMMARY = "\n".join(_catalog_lines)
+del _catalog_lines, _category, _title, _category_products
+
+@lru_cache(maxsize=1)
+def _token_table():
+    """Hashed word tokens per product (row i is PRODUCTS[i]), built on the first multi-word search."""
+    return build_token_table(tokenize(product.search_blob) for product in PRODUCTS)
+
+# Column arrays for vectorized filtering; entry i describes PRODUCTS[i]
+_CAT_CODE = {category: code for code, category in enumerate(PRODUCTS_BY_CATEGORY)}
+_BRAND_CODE = {brand: code for code, brand in enumerate(_BY_BRAND_LOWER)}
+_PRICES = np.array([product.price for product in PRODUCTS], dtype=np.int32)
+_CAT_CODES = np.array([_CAT_CODE[product.category] for product in PRODUCTS], dtype=np.int16)
+_BRAND_CODES = np.array([_BRAND_CODE[product.brand.lower()] for product in PRODUCTS], dtype=np.int16)
+
+# Lowercased feature/tag phrases -> indices of the products that list them; with pyahocorasick
+# installed they are compiled into one automaton so a query is scanned for all of them in a single pass
+_PHRASE_INDEX = {}
+for _index, _product in enumerate(PRODUCTS):
+    for _phrase in {*_product.features, *_product.tags}:
+        _PHRASE_INDEX.setdefault(_phrase.lower(), []).append(_index)
+_PHRASE_INDEX = {phrase: tuple(indices) for phrase, indices in _PHRASE_INDEX.items()}
+del _index, _product, _phrase
+
+_PHRASE_AUTOMATON = None
+if ahocorasick is not None:
+    _PHRASE_AUTOMATON = ahocorasick.Automaton()
+    for _phrase, _indices in _PHRASE_INDEX.items():
+        _PHRASE_AUTOMATON.add_word(_phrase, (_phrase, _indices))
+    _PHRASE_AUTOMATON.make_automaton()
+    del _phrase, _indices
+
+def _iter_phrase_matches(text):
+    """Yield (start, end, product_indices) for every catalog phrase occurring in the text."""
+    if _PHRASE_AUTOMATON is not None:
+        for last, (phrase, indices) in _PHRASE_AUTOMATON.iter(text):
+            yield last - len(phrase) + 1, last + 1, indices
+        return
+    for phrase, indices in _PHRASE_INDEX.items():
+        start = text.find(phrase)
+        while start != -1:
+            yield start, start + len(phrase), indices
+            start = text.find(phrase, start + 1)
+
 def get_products_by_category(category=None):
     """Get products filtered by category."""
     if category:
-        return [product for product in PRODUCTS if product["category"] == category]
+        return PRODUCTS_BY_CATEGORY.get(category, ())
     return PRODUCTS
 
 def get_product_by_id(product_id):
     """Get a specific product by ID."""
-    for product in PRODUCTS:
-        if product["id"] == product_id:
-            return product
-    return None
+    return _BY_ID.get(product_id)
 
 def get_products_by_price_range(min_price=0, max_price=float('inf')):
     """Get products within a price range."""
-    return [product for product in PRODUCTS if min_price <= product["price"] <= max_price]
+    return filter_products(min_price=min_price, max_price=max_price)
 
 def get_products_by_brand(brand):
-    """Get products by brand."""
-    return [product for product in PRODUCTS if product["brand"].lower() == brand.lower()]
+    """Get products by brand (case-insensitive)."""
+    return _BY_BRAND_LOWER.get(brand.lower(), ())
+
+def get_product_ids_by_token(token):
+    """Get the IDs of products whose searchable text contains the given lowercase word, or None."""
+    return _TOKEN_INDEX.get(token)
+
+def get_product_ids_with_all_tokens(tokens):
+    """Get the IDs of products whose searchable text contains every one of the given lowercase words."""
+    return {PRODUCTS[i].id for i in match_all_tokens(tokens, *_token_table())}
+
+def filter_products(category=None, brand=None, min_price=0, max_price=float('inf')):
+    """Get products matching all of the given filters (brand is case-insensitive), in catalog order."""
+    mask = (_PRICES >= min_price) & (_PRICES <= max_price)
+    if category:
+        if category not in _CAT_CODE:
+            return []
+        mask &= _CAT_CODES == _CAT_CODE[category]
+    if brand:
+        brand_lower = brand.lower()
+        if brand_lower not in _BRAND_CODE:
+            return []
+        mask &= _BRAND_CODES == _BRAND_CODE[brand_lower]
+    return [PRODUCTS[i] for i in np.flatnonzero(mask)]
+
+def get_product_ids_mentioned_in(text):
+    """Get the IDs of products with a feature or tag mentioned as whole words in the given lowercase text."""
+    product_ids = set()
+    for start, end, indices in _iter_phrase_matches(text):
+        # Skip matches inside longer words ("ai" in "rain")
+        if (start > 0 and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+            continue
+        product_ids.update(PRODUCTS[i].id for i in indices)
+    return product_ids
@@ -0,0 +1,105 @@
+"""
+Token-hash matching kernel for catalog keyword search.
+Large tables use a Numba-compiled loop when Numba is installed; small ones (and installs without
+Numba) use NumPy, so importing the catalog never pays for loading Numba.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+# Tables with fewer rows are matched with NumPy; below this size Numba's import and JIT cost more
+# than they save
+NUMBA_MIN_ROWS = 10000
+
+_WORD_RE = re.compile(r"\w+")
+
+_FNV_OFFSET = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+def tokenize(text: str) -> List[str]:
+    """Split lowercase text into word tokens."""
+    return _WORD_RE.findall(text)
+
+def fnv1a_64(token: str) -> int:
+    """Hash a token with 64-bit FNV-1a, returned as a signed value that fits in np.int64."""
+    h = _FNV_OFFSET
+    for byte in token.encode("utf-8"):
+        h = ((h ^ byte) * _FNV_PRIME) & _MASK_64
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+def build_token_table(token_lists: Iterable[Iterable[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash each product's distinct tokens into a padded 2-D table.
+    
+    Returns:
+        (token_hashes, lengths): an int64 array of shape (n_products, max_tokens) and the
+        number of valid entries in each row
+    """
+    rows = [sorted({fnv1a_64(token) for token in tokens}) for tokens in token_lists]
+    lengths = np.array([len(row) for row in rows], dtype=np.int64)
+    token_hashes = np.zeros((len(rows), int(lengths.max(initial=0))), dtype=np.int64)
+    for i, row in enumerate(rows):
+        token_hashes[i, :len(row)] = row
+    return token_hashes, lengths
+
+def _match_all_numpy(query_hashes, token_hashes, lengths):
+    """Indices of rows containing every query hash."""
+    valid = np.arange(token_hashes.shape[1]) < lengths[:, None]
+    matched = np.ones(token_hashes.shape[0], dtype=bool)
+    for query_hash in query_hashes:
+        matched &= ((token_hashes == query_hash) & valid).any(axis=1)
+    return np.flatnonzero(matched)
+
+def _match_all_loop(query_hashes, token_hashes, lengths):
+    """Indices of rows containing every query hash, as an early-exit loop for Numba to compile."""
+    out = np.empty(token_hashes.shape[0], dtype=np.int64)
+    n = 0
+    for i in range(token_hashes.shape[0]):
+        matched = True
+        for q in range(query_hashes.shape[0]):
+            found = False
+            for j in range(lengths[i]):
+                if token_hashes[i, j] == query_hashes[q]:
+                    found = True
+                    break
+            if not found:
+                matched = False
+                break
+        if matched:
+            out[n] = i
+            n += 1
+    return out[:n]
+
+@lru_cache(maxsize=1)
+def _numba_kernel():
+    """Compile the loop kernel with Numba on first use, or return None if Numba isn't installed."""
+    try:
+        from numba import njit
+    except ImportError:  # Numba is optional
+        return None
+    return njit(cache=True)(_match_all_loop)
+
+def match_all_tokens(tokens: Iterable[str], token_hashes: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Find the rows of a token table that contain all of the given tokens.
+    
+    Args:
+        tokens: Lowercase query tokens
+        token_hashes: Table built by build_token_table
+        lengths: Row lengths built by build_token_table
+    
+    Returns:
+        Array of matching row indices, in ascending order
+    """
+    query_hashes = np.array(sorted({fnv1a_64(token) for token in tokens}), dtype=np.int64)
+    if query_hashes.size == 0:
+        return np.empty(0, dtype=np.int64)
+    
+    kernel = _numba_kernel() if token_hashes.shape[0] >= NUMBA_MIN_ROWS else None
+    if kernel is None:
+        kernel = _match_all_numpy
+    return kernel(query_hashes, token_hashes, lengths)
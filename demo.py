@@ -3,167 +3,194 @@ Demo script for the Product Recommendation Chatbot.
 This script demonstrates the system functionality without requiring external API keys.
 """
 
-import json
-from data.products import PRODUCTS, get_products_by_category, get_products_by_price_range
+import re
+import sys
+from functools import lru_cache
 
-def simple_search(query, products):
-    """Simple keyword-based search for demo purposes."""
-    query_lower = query.lower()
-    results = []
+# The catalog (and NumPy behind its indexes) is imported inside the functions that use it,
+# so the menu starts without loading it and choosing "Exit" never touches it
+
+# Whole-word keywords (singular and plural) for category and brand detection, checked in priority order
+_CATEGORY_KEYWORDS = {
+    "phone": frozenset({"phone", "phones", "smartphone", "smartphones", "iphone", "iphones", "android"}),
+    "laptop": frozenset({"laptop", "laptops", "computer", "computers", "macbook", "macbooks", "notebook", "notebooks"}),
+    "tablet": frozenset({"tablet", "tablets", "ipad", "ipads"}),
+}
+_BRANDS = ("Apple", "Samsung", "Google", "OnePlus", "Dell", "Lenovo", "ASUS", "Microsoft", "Amazon")
+_BRAND_KEYWORDS = {brand: frozenset({brand.lower()}) for brand in _BRANDS}
+
+_QUIT_WORDS = frozenset({"quit", "exit", "bye"})
+_NO_PRICE_FILTER = (0, float('inf'))
+
+# "under $1500" or "under $1,500"; thousands separators are dropped with a translate table
+_PRICE_RE = re.compile(r"under\s*\$?\s*(\d[\d,]*)")
+_STRIP_COMMAS = str.maketrans("", "", ",")
+
+# Fixed console text, emitted with a single write each
+_EXAMPLE_QUERIES = (
+    "- 'I need a phone for photography'\n"
+    "- 'Show me laptops under $1500'\n"
+    "- 'What tablets do you have?'\n"
+)
+_HELP_TEXT = (
+    "\n💡 Example queries:\n"
+    + _EXAMPLE_QUERIES
+    + "- 'Apple products'\n"
+    "- 'gaming laptop'\n"
+    "- 'budget options'\n"
+    "\n"
+)
+_NO_RESULTS_TEXT = (
+    "\n🤖 Assistant: I couldn't find any products matching your request.\n"
+    "Try being more specific, for example:\n"
+    + _EXAMPLE_QUERIES
+    + "\n"
+)
+_CHAT_BANNER = (
+    "🛍️ Welcome to TechStore Assistant Demo!\n"
+    + "=" * 50 + "\n"
+    "This is a demo version that shows how the system works.\n"
+    "You can ask about phones, laptops, and tablets.\n"
+    "Type 'quit' to exit, 'help' for examples.\n\n"
+)
+_MAIN_BANNER = "🛍️ TechStore Assistant - Demo Mode\n" + "=" * 50 + "\n"
+_MENU_TEXT = (
+    "\nChoose an option:\n"
+    "1. Start chat demo\n"
+    "2. View product catalog\n"
+    "3. Exit\n"
+)
+
+def simple_search(query_lower, products):
+    """
+    Simple keyword-based search for demo purposes; expects an already-lowercased query.
+    Returns the matches of the first search tier that finds any, as a tuple in catalog order.
+    """
+    from data.products import (
+        get_product_ids_by_token,
+        get_product_ids_mentioned_in,
+        get_product_ids_with_all_tokens,
+    )
+    from data.search_numba import tokenize
     
-    for product in products:
-        # Check if query matches product name, description, or features
-        if (query_lower in product['name'].lower() or
-            query_lower in product['description'].lower() or
-            any(query_lower in feature.lower() for feature in product['features']) or
-            any(query_lower in tag.lower() for tag in product['tags'])):
-            results.append(product)
+    # Single-word queries are answered from the token index
+    matching_ids = get_product_ids_by_token(query_lower)
+    if matching_ids:
+        return tuple(product for product in products if product.id in matching_ids)
     
-    return results
+    # Otherwise match the query against each product's precomputed searchable text
+    matches = tuple(product for product in products if query_lower in product.search_blob)
+    if matches:
+        return matches
+    
+    # No exact phrase: try products that contain every word of a multi-word query
+    words = tokenize(query_lower)
+    if len(words) > 1:
+        matching_ids = get_product_ids_with_all_tokens(words)
+        matches = tuple(product for product in products if product.id in matching_ids)
+        if matches:
+            return matches
+    
+    # Loosest match: products whose features or tags are mentioned anywhere in the query
+    matching_ids = get_product_ids_mentioned_in(query_lower)
+    return tuple(product for product in products if product.id in matching_ids)
+
+@lru_cache(maxsize=256)
+def search_catalog(query_lower, category=None, brand=None, price_filter=None):
+    """
+    Search the catalog narrowed by every given filter, memoized per query and filter signature.
+    Returns a tuple of products; the catalog is static, so cached results never go stale.
+    """
+    from data.products import PRODUCTS, filter_products
+    
+    if category or brand or price_filter:
+        min_price, max_price = price_filter or _NO_PRICE_FILTER
+        scope = filter_products(category, brand, min_price, max_price)
+    else:
+        scope = PRODUCTS
+    return simple_search(query_lower, scope)
 
 def format_product_display(product):
     """Format a product for display."""
+    return _format_cached(product.id)
+
+@lru_cache(maxsize=None)
+def _format_cached(product_id):
+    """Build the display text for a product once; the catalog doesn't change at runtime."""
+    from data.products import get_product_by_id
+    product = get_product_by_id(product_id)
     return f"""
-📱 {product['name']} (${product['price']})
-   Brand: {product['brand']}
-   Description: {product['description']}
-   Key Features: {', '.join(product['features'][:3])}
-   Category: {product['category'].title()}
+📱 {product.name} (${product.price})
+   Brand: {product.brand}
+   Description: {product.description}
+   Key Features: {product.top_features}
+   Category: {product.category.title()}
 """
 
 def demo_chat():
     """Interactive demo chat interface."""
-    print("🛍️ Welcome to TechStore Assistant Demo!")
-    print("=" * 50)
-    print("This is a demo version that shows how the system works.")
-    print("You can ask about phones, laptops, and tablets.")
-    print("Type 'quit' to exit, 'help' for examples.\n")
+    from data.search_numba import tokenize
+    
+    sys.stdout.write(_CHAT_BANNER)
     
     while True:
         user_input = input("You: ").strip()
+        query_lower = user_input.lower()
         
-        if user_input.lower() in ['quit', 'exit', 'bye']:
+        if query_lower in _QUIT_WORDS:
             print("👋 Thanks for trying the demo! Goodbye!")
             break
         
-        if user_input.lower() == 'help':
-            print("\n💡 Example queries:")
-            print("- 'I need a phone for photography'")
-            print("- 'Show me laptops under $1500'")
-            print("- 'What tablets do you have?'")
-            print("- 'Apple products'")
-            print("- 'gaming laptop'")
-            print("- 'budget options'")
-            print()
+        if query_lower == 'help':
+            sys.stdout.write(_HELP_TEXT)
             continue
         
         if not user_input:
             continue
         
-        # Simple intent detection
-        query_lower = user_input.lower()
-        
-        # Category detection
-        category = None
-        if any(word in query_lower for word in ['phone', 'smartphone', 'iphone', 'android']):
-            category = 'phone'
-        elif any(word in query_lower for word in ['laptop', 'computer', 'macbook', 'notebook']):
-            category = 'laptop'
-        elif any(word in query_lower for word in ['tablet', 'ipad']):
-            category = 'tablet'
-        
-        # Brand detection
-        brand = None
-        if 'apple' in query_lower:
-            brand = 'Apple'
-        elif 'samsung' in query_lower:
-            brand = 'Samsung'
-        elif 'google' in query_lower:
-            brand = 'Google'
-        elif 'oneplus' in query_lower:
-            brand = 'OnePlus'
-        elif 'dell' in query_lower:
-            brand = 'Dell'
-        elif 'lenovo' in query_lower:
-            brand = 'Lenovo'
-        elif 'asus' in query_lower:
-            brand = 'ASUS'
-        elif 'microsoft' in query_lower:
-            brand = 'Microsoft'
-        elif 'amazon' in query_lower:
-            brand = 'Amazon'
+        # Category and brand detection: tokenize once, then intersect with each keyword set
+        tokens = frozenset(tokenize(query_lower))
+        category = next((cat for cat, keywords in _CATEGORY_KEYWORDS.items() if tokens & keywords), None)
+        brand = next((name for name, keywords in _BRAND_KEYWORDS.items() if tokens & keywords), None)
         
-        # Price detection (simple)
+        # Price detection (simple): "under $1500"
         price_filter = None
-        if 'under' in query_lower and '$' in query_lower:
-            # Extract price after "under"
-            try:
-                price_text = query_lower.split('under')[-1].strip()
-                price = int(''.join(filter(str.isdigit, price_text)))
-                price_filter = (0, price)
-            except:
-                pass
+        price_match = _PRICE_RE.search(query_lower)
+        if price_match:
+            price_filter = (0, int(price_match.group(1).translate(_STRIP_COMMAS)))
         
-        # Search logic
-        results = []
+        # Search logic: narrow the catalog by every detected filter, then search within it;
+        # repeated queries are answered from the cache
+        results = search_catalog(query_lower, category, brand, price_filter)
+        total = len(results)
         
-        if category:
-            category_products = get_products_by_category(category)
-            results = simple_search(user_input, category_products)
-        elif brand:
-            brand_products = [p for p in PRODUCTS if p['brand'].lower() == brand.lower()]
-            results = simple_search(user_input, brand_products)
-        elif price_filter:
-            price_products = get_products_by_price_range(price_filter[0], price_filter[1])
-            results = simple_search(user_input, price_products)
-        else:
-            results = simple_search(user_input, PRODUCTS)
-        
-        # Generate response
+        # Generate response, buffered into one write per turn
         if results:
-            print(f"\n🤖 Assistant: I found {len(results)} product(s) that match your request:")
+            parts = [f"\n🤖 Assistant: I found {total} product(s) that match your request:\n"]
             for product in results[:3]:  # Show top 3
-                print(format_product_display(product))
+                parts.append(format_product_display(product))
+                parts.append("\n")
             
-            if len(results) > 3:
-                print(f"... and {len(results) - 3} more options available.")
+            if total > 3:
+                parts.append(f"... and {total - 3} more options available.\n")
             
-            print("\nWould you like me to provide more details about any of these products?")
+            parts.append("\nWould you like me to provide more details about any of these products?\n\n")
+            sys.stdout.write("".join(parts))
         else:
-            print("\n🤖 Assistant: I couldn't find any products matching your request.")
-            print("Try being more specific, for example:")
-            print("- 'I need a phone for photography'")
-            print("- 'Show me laptops under $1500'")
-            print("- 'What tablets do you have?'")
-        
-        print()
+            sys.stdout.write(_NO_RESULTS_TEXT)
 
 def show_product_catalog():
     """Display the full product catalog."""
-    print("📋 Full Product Catalog")
-    print("=" * 50)
+    from data.products import CATALOG_SUMMARY
     
-    categories = ['phone', 'laptop', 'tablet']
-    category_names = {'phone': '📱 Smartphones', 'laptop': '💻 Laptops', 'tablet': '📱 Tablets'}
-    
-    for category in categories:
-        products = get_products_by_category(category)
-        print(f"\n{category_names[category]} ({len(products)} products):")
-        print("-" * 30)
-        
-        for product in products:
-            print(f"• {product['name']} - ${product['price']} ({product['brand']})")
+    sys.stdout.write(f"📋 Full Product Catalog\n{'=' * 50}\n{CATALOG_SUMMARY}\n")
 
 def main():
     """Main demo function."""
-    print("🛍️ TechStore Assistant - Demo Mode")
-    print("=" * 50)
+    sys.stdout.write(_MAIN_BANNER)
     
     while True:
-        print("\nChoose an option:")
-        print("1. Start chat demo")
-        print("2. View product catalog")
-        print("3. Exit")
+        sys.stdout.write(_MENU_TEXT)
         
         choice = input("\nEnter your choice (1-3): ").strip()
         
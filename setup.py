@@ -7,7 +7,6 @@ Helps users install dependencies and configure the environment.
 import os
 import sys
 import subprocess
-import shutil
 
 def check_python_version():
     """Check if Python version is compatible."""
@@ -18,24 +17,40 @@ def check_python_version():
     print(f"✅ Python version: {sys.version}")
     return True
 
-def install_dependencies():
+def install_dependencies(verbose=False):
     """Install required dependencies."""
     print("\n📦 Installing dependencies...")
+    
+    # Prefer prebuilt wheels so pip doesn't compile packages from source; pip's own
+    # progress output is only shown with --verbose (errors still go to stderr)
+    command = [
+        sys.executable, "-m", "pip", "install",
+        "--prefer-binary", "--no-input", "--disable-pip-version-check",
+        "-r", "requirements.txt",
+    ]
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        subprocess.check_call(command, stdout=None if verbose else subprocess.DEVNULL)
         print("✅ Dependencies installed successfully!")
         return True
     except subprocess.CalledProcessError as e:
         print(f"❌ Error installing dependencies: {e}")
         return False
 
-def create_env_file():
+def scan_project_dir():
+    """List the project directory once so the setup checks don't each stat the filesystem."""
+    with os.scandir(".") as it:
+        return {entry.name: entry for entry in it}
+
+def create_env_file(entries):
     """Create .env file from template."""
-    if os.path.exists(".env"):
+    if ".env" in entries:
         print("✅ .env file already exists")
         return True
     
-    if os.path.exists("env_example.txt"):
+    if "env_example.txt" in entries:
+        # Only needed here, so keep it off the startup path
+        import shutil
+        
         try:
             shutil.copy("env_example.txt", ".env")
             print("✅ Created .env file from template")
@@ -48,11 +63,11 @@ def create_env_file():
         print("❌ env_example.txt not found")
         return False
 
-def check_directories():
+def check_directories(entries):
     """Check if required directories exist."""
     required_dirs = ["data", "utils"]
     for directory in required_dirs:
-        if not os.path.exists(directory):
+        if directory not in entries or not entries[directory].is_dir():
             print(f"❌ Required directory '{directory}' not found")
             return False
     print("✅ All required directories exist")
@@ -67,18 +82,20 @@ def main():
     if not check_python_version():
         return
     
+    entries = scan_project_dir()
+    
     # Check directories
-    if not check_directories():
+    if not check_directories(entries):
         print("❌ Setup failed: Missing required directories")
         return
     
     # Install dependencies
-    if not install_dependencies():
+    if not install_dependencies(verbose="--verbose" in sys.argv[1:]):
         print("❌ Setup failed: Could not install dependencies")
         return
     
     # Create .env file
-    if not create_env_file():
+    if not create_env_file(entries):
         print("❌ Setup failed: Could not create .env file")
         return
     
@@ -0,0 +1,55 @@
+"""
+Shared background event loop for the chatbot's async pipeline.
+Async API clients keep connection pools bound to the loop they first ran on, so synchronous
+callers (Streamlit, the CLI) submit coroutines to one long-lived loop instead of calling
+asyncio.run() with a fresh loop per request.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Threads for blocking calls (Pinecone queries, synchronous embedders) made from the shared loop;
+# the default executor is sized to the CPU count, which would cap concurrent chats on small hosts
+BLOCKING_WORKERS = 32
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Get the shared loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop.set_default_executor(ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="chatbot-blocking"))
+            threading.Thread(target=_loop.run_forever, name="chatbot-event-loop", daemon=True).start()
+        return _loop
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine on the shared loop and block until it finishes.
+    Must not be called from a coroutine already running on that loop.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+async def run_blocking(func: Callable[..., T], *args: Any) -> T:
+    """Run a blocking function in the default executor so it doesn't stall the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args))
+
+def iterate_sync(agen: AsyncIterator[T]) -> Iterator[T]:
+    """Drive an async generator on the shared loop, yielding its items to synchronous code."""
+    try:
+        while True:
+            try:
+                yield run_sync(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        # Runs the generator's cleanup if the consumer stopped early
+        run_sync(agen.aclose())
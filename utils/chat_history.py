@@ -0,0 +1,149 @@
+"""
+Chat history persistence backed by SQLite.
+Stores each session's messages together with their pre-rendered HTML.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import markdown
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+
+# URL schemes allowed in rendered links and images; anything else (e.g. javascript:) is dropped
+_SAFE_URL_SCHEMES = ("http:", "https:", "mailto:")
+
+class _DropUnsafeUrls(Treeprocessor):
+    """Remove link and image URLs with a scheme outside _SAFE_URL_SCHEMES."""
+    
+    def run(self, root):
+        for element in root.iter():
+            for attribute in ("href", "src"):
+                url = element.get(attribute)
+                if url and ":" in url.split("/", 1)[0] and not url.lower().startswith(_SAFE_URL_SCHEMES):
+                    del element.attrib[attribute]
+
+class _SafeMarkdown(Extension):
+    """Render markdown like st.markdown does: raw HTML is shown as text, not interpreted."""
+    
+    def extendMarkdown(self, md):
+        md.preprocessors.deregister("html_block")
+        md.inlinePatterns.deregister("html")
+        md.treeprocessors.register(_DropUnsafeUrls(md), "drop_unsafe_urls", 0)
+
+def render_message_html(role: str, content: str) -> str:
+    """Render a chat message to HTML once so history can be redrawn without re-parsing markdown."""
+    css_class = "user-message" if role == "user" else "bot-message"
+    return f'<div class="{css_class}">{markdown.markdown(content, extensions=[_SafeMarkdown()])}</div>'
+
+class ChatHistoryStore:
+    def __init__(self, db_path: str = "chat_history.db", retention_seconds: float = 7 * 24 * 60 * 60):
+        """
+        Open (or create) the chat history database.
+        
+        Args:
+            db_path: Path of the SQLite database file
+            retention_seconds: Sessions without new messages for this long are deleted
+        """
+        self.db_path = db_path
+        self.retention_seconds = retention_seconds
+        self._last_purge = 0.0
+        
+        # One connection shared by all Streamlit sessions, serialized with a lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS messages (
+                    session_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    html TEXT NOT NULL,
+                    PRIMARY KEY (session_id, idx)
+                )
+                """
+            )
+            # Last activity per session, used for retention
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, updated_at REAL NOT NULL)"
+            )
+        
+        self.purge_expired()
+    
+    def append(self, session_id: str, role: str, content: str) -> int:
+        """
+        Append a message to a session, pre-rendering its HTML.
+        
+        Returns:
+            The number of messages in the session afterwards
+        """
+        message_html = render_message_html(role, content)
+        now = time.time()
+        with self._lock, self._conn:
+            idx = self._count(session_id)
+            self._conn.execute(
+                "INSERT INTO messages (session_id, idx, role, content, html) VALUES (?, ?, ?, ?, ?)",
+                (session_id, idx, role, content, message_html),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, updated_at) VALUES (?, ?)",
+                (session_id, now),
+            )
+        
+        # Long-running servers purge at most once an hour
+        if now - self._last_purge > 60 * 60:
+            self.purge_expired()
+        return idx + 1
+    
+    def count(self, session_id: str) -> int:
+        """Get the number of messages stored for a session."""
+        with self._lock:
+            return self._count(session_id)
+    
+    def get_messages(self, session_id: str, start: int = 0, end: Optional[int] = None) -> List[Dict]:
+        """Get the messages with index in [start, end) for a session, oldest first."""
+        query = "SELECT role, content FROM messages WHERE session_id = ? AND idx >= ?"
+        params = [session_id, start]
+        if end is not None:
+            query += " AND idx < ?"
+            params.append(end)
+        query += " ORDER BY idx"
+        
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+    
+    def get_rendered_html(self, session_id: str, end: int) -> str:
+        """Get the concatenated pre-rendered HTML of the first `end` messages of a session."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT html FROM messages WHERE session_id = ? AND idx < ? ORDER BY idx",
+                (session_id, end),
+            ).fetchall()
+        return "".join(row[0] for row in rows)
+    
+    def clear(self, session_id: str):
+        """Delete all messages of a session."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+    
+    def purge_expired(self):
+        """Delete sessions idle for longer than the retention period."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.retention_seconds,))
+            # Also drops messages written before session tracking existed
+            self._conn.execute("DELETE FROM messages WHERE session_id NOT IN (SELECT session_id FROM sessions)")
+        self._last_purge = now
+    
+    def _count(self, session_id: str) -> int:
+        """Count a session's messages; the caller must hold the lock."""
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM messages WHERE session_id = ?", (session_id,)
+        ).fetchone()[0]
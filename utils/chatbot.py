@@ -3,97 +3,242 @@ Chatbot module using Langchain and Azure OpenAI for product recommendations.
 Handles conversation flow and generates contextual responses.
 """
 
+import asyncio
 import os
-from typing import List, Dict, Any
+import re
+import weakref
+from functools import lru_cache
+import orjson
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional
 from langchain_openai import AzureChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage, AIMessage
+from langchain.schema import BaseMessage, SystemMessage
 from langchain.prompts import ChatPromptTemplate
 from langchain.chains import LLMChain
-from langchain.memory import ConversationBufferMemory
-from utils.vector_store import ProductVectorStore
+from langchain.memory import ConversationBufferWindowMemory
+from utils.async_loop import iterate_sync, run_sync
+from utils.vector_store import get_vector_store
+from data.products import PRODUCTS
 
-class ProductRecommendationChatbot:
-    def __init__(self):
-        """Initialize the chatbot with Azure OpenAI and vector store."""
-        self.llm = AzureChatOpenAI(
-            azure_deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
+# Returned by chat() when processing fails; callers use it to avoid caching failures
+ERROR_RESPONSE = "I'm sorry, I encountered an error while processing your request. Please try again or rephrase your question."
+
+# Yielded last by astream_chat()/chat_stream() when the answer was cut off after part of it was sent;
+# consumers drop it and must not cache the partial text
+STREAM_INTERRUPTED = object()
+
+NO_RESULTS_RESPONSE = "I couldn't find any products matching your requirements. Could you please provide more details about what you're looking for? For example:\n- What type of device (phone, laptop, tablet)?\n- What's your budget range?\n- Any specific features you need?\n- Preferred brand?"
+
+# Prompts are built once at import; only the per-call variables are substituted
+SYSTEM_PROMPT = """You are a helpful product recommendation assistant for an electronics store. 
+You help customers find the perfect phone, laptop, or tablet based on their needs and preferences.
+
+Your capabilities:
+- Understand customer requirements and preferences
+- Search through product catalog using semantic similarity
+- Provide detailed product recommendations with explanations
+- Answer questions about product specifications and features
+- Help with price comparisons and budget considerations
+
+Available product categories:
+- Phones: Smartphones from Apple, Samsung, Google, OnePlus
+- Laptops: MacBooks, Windows laptops, gaming laptops, business laptops
+- Tablets: iPads, Android tablets, 2-in-1 devices
+
+Always be helpful, friendly, and provide specific recommendations with reasoning.
+If you don't have enough information, ask clarifying questions.
+"""
+
+SYSTEM_MESSAGE = SystemMessage(content=SYSTEM_PROMPT)
+
+_CONVERSATION_PROMPT = ChatPromptTemplate.from_messages([
+    SYSTEM_MESSAGE,
+    ("human", "{input}"),
+    ("ai", "{output}")
+])
+
+_INTENT_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """Analyze the user's message and extract search intent.
+
+Extract the following information:
+1. Product category (phone/laptop/tablet or None if not specified)
+2. Price range (min_price, max_price or None if not specified)
+3. Brand preference (specific brand or None if not specified)
+4. Key features or requirements (list of important features)
+5. Search query (the main search terms)
+
+Return as JSON format:
+{{
+    "category": "phone/laptop/tablet/None",
+    "min_price": null,
+    "max_price": null,
+    "brand": "brand_name/None",
+    "features": ["feature1", "feature2"],
+    "search_query": "main search terms"
+}}
+"""),
+    ("human", "{user_message}")
+])
+
+_RESPONSE_PROMPT = ChatPromptTemplate.from_messages([
+    ("human", """User is looking for products and you found these options:
+
+{product_context}
+
+User message: "{user_message}"
+
+Provide a helpful, conversational response that:
+1. Acknowledges their request
+2. Presents the recommendations naturally
+3. Asks follow-up questions to help them decide
+4. Mentions key benefits of the recommended products
+
+Be friendly and helpful, as if you're a knowledgeable sales assistant.
+""")
+])
+
+# Keyword fast path for intent extraction; the LLM is only asked when these are missing or ambiguous
+_CATEGORY_KEYWORD_RE = re.compile(
+    r"\b(?:(?P<phone>(?:smart)?phones?|iphones?|android)"
+    r"|(?P<laptop>laptops?|macbooks?|notebooks?|computers?)"
+    r"|(?P<tablet>tablets?|ipads?))\b",
+    re.IGNORECASE
+)
+_BRAND_NAMES = {product.brand.lower(): product.brand for product in PRODUCTS}
+_BRAND_KEYWORD_RE = re.compile(r"\b(" + "|".join(map(re.escape, _BRAND_NAMES)) + r")\b", re.IGNORECASE)
+# A bare number only counts as a price when it isn't a spec like "16GB" or "120Hz"; the digit/comma
+# guard stops the match from backtracking to a shorter number
+_NOT_A_UNIT = r"(?![\d,]|\s*(?:(?:gb|tb|mb|mp|mah|hz|ghz|inch(?:es)?|cores?|hours?|hrs?)\b|\"))"
+_PRICE_RANGE_RE = re.compile(r"\$\s*(\d[\d,]*)\s*(?:-|to)\s*\$?\s*(\d[\d,]*)" + _NOT_A_UNIT, re.IGNORECASE)
+_MAX_PRICE_RE = re.compile(
+    r"\b(?:under|below|less than|up to|max(?:imum)?)\s*(?:\$\s*(\d[\d,]*)|(\d[\d,]*)" + _NOT_A_UNIT + ")",
+    re.IGNORECASE
+)
+_MIN_PRICE_RE = re.compile(
+    r"\b(?:over|above|more than|at least|min(?:imum)?)\s*(?:\$\s*(\d[\d,]*)|(\d[\d,]*)" + _NOT_A_UNIT + ")",
+    re.IGNORECASE
+)
+
+def _parse_price(text: str) -> int:
+    """Parse a price such as "1,500"."""
+    return int(text.replace(",", ""))
+
+@lru_cache(maxsize=1)
+def get_llm() -> AzureChatOpenAI:
+    """Get the chat model shared by all chatbot instances, so its HTTP connections are reused."""
+    return AzureChatOpenAI(
+        azure_deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
+        openai_api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2023-12-01-preview"),
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+        temperature=0.7
+    )
+
+@lru_cache(maxsize=1)
+def get_intent_llm():
+    """Get the shared model used for intent extraction."""
+    # Intent extraction only needs a short JSON reply, so cap its completion length; it can also
+    # run on a separate lower-latency deployment when one is configured
+    fast_deployment = os.getenv("AZURE_OPENAI_FAST_DEPLOYMENT_NAME")
+    intent_llm = get_llm()
+    if fast_deployment:
+        intent_llm = AzureChatOpenAI(
+            azure_deployment=fast_deployment,
             openai_api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2023-12-01-preview"),
             azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
             api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            temperature=0.7
+            temperature=0
         )
+    return intent_llm.bind(max_tokens=256)
+
+# Upper bound on chat turns in flight at once per event loop, so a burst of sessions can't flood the APIs
+MAX_CONCURRENT_CHATS = 32
+
+# One semaphore per running loop: a semaphore binds to the loop it is first awaited on, and achat()
+# may be awaited on a caller's own loop as well as the shared one used by chat()/chat_stream()
+_chat_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+def _get_chat_slots() -> asyncio.Semaphore:
+    """Get the semaphore limiting concurrent chat turns on the running loop."""
+    loop = asyncio.get_running_loop()
+    slots = _chat_slots.get(loop)
+    if slots is None:
+        slots = _chat_slots[loop] = asyncio.Semaphore(MAX_CONCURRENT_CHATS)
+    return slots
+
+class ProductRecommendationChatbot:
+    def __init__(self):
+        """Initialize the chatbot's conversation state on top of the shared model and vector store."""
+        # API clients are process-wide; each instance only owns its memory and prompts
+        self.llm = get_llm()
+        self.intent_llm = get_intent_llm()
+        self.vector_store = get_vector_store()
         
-        self.vector_store = ProductVectorStore()
-        self.memory = ConversationBufferMemory(
+        # Not read or written by achat()/astream_chat() yet: turns are answered from the current message
+        # alone, and the app shares one chatbot across sessions. If memory is wired in, the window
+        # bounds any prompt built from it to the last six exchanges
+        self.memory = ConversationBufferWindowMemory(
+            k=6,
             memory_key="chat_history",
             return_messages=True
         )
         
-        # System prompt for the chatbot
-        self.system_prompt = """You are a helpful product recommendation assistant for an electronics store. 
-        You help customers find the perfect phone, laptop, or tablet based on their needs and preferences.
-        
-        Your capabilities:
-        - Understand customer requirements and preferences
-        - Search through product catalog using semantic similarity
-        - Provide detailed product recommendations with explanations
-        - Answer questions about product specifications and features
-        - Help with price comparisons and budget considerations
-        
-        Available product categories:
-        - Phones: Smartphones from Apple, Samsung, Google, OnePlus
-        - Laptops: MacBooks, Windows laptops, gaming laptops, business laptops
-        - Tablets: iPads, Android tablets, 2-in-1 devices
-        
-        Always be helpful, friendly, and provide specific recommendations with reasoning.
-        If you don't have enough information, ask clarifying questions.
-        """
+        self.system_prompt = SYSTEM_PROMPT
         
         # Create the conversation chain
         self.conversation_chain = self._create_conversation_chain()
     
     def _create_conversation_chain(self):
         """Create the Langchain conversation chain."""
-        prompt_template = ChatPromptTemplate.from_messages([
-            ("system", self.system_prompt),
-            ("human", "{input}"),
-            ("ai", "{output}")
-        ])
-        
         return LLMChain(
             llm=self.llm,
-            prompt=prompt_template,
+            prompt=_CONVERSATION_PROMPT,
             memory=self.memory,
             verbose=False
         )
     
-    def _extract_search_intent(self, user_message: str) -> Dict[str, Any]:
-        """Extract search intent and filters from user message."""
-        intent_prompt = f"""
-        Analyze the following user message and extract search intent:
+    def _keyword_intent(self, user_message: str) -> Optional[Dict[str, Any]]:
+        """
+        Extract the search intent with keyword matching alone.
         
-        User message: "{user_message}"
+        Returns:
+            The intent if exactly one category, or otherwise exactly one brand, is mentioned; else None
+        """
+        categories = {match.lastgroup for match in _CATEGORY_KEYWORD_RE.finditer(user_message)}
+        brands = {match.group(1).lower() for match in _BRAND_KEYWORD_RE.finditer(user_message)}
+        if len(categories) > 1 or len(brands) > 1 or not (categories or brands):
+            return None
         
-        Extract the following information:
-        1. Product category (phone/laptop/tablet or None if not specified)
-        2. Price range (min_price, max_price or None if not specified)
-        3. Brand preference (specific brand or None if not specified)
-        4. Key features or requirements (list of important features)
-        5. Search query (the main search terms)
+        min_price = max_price = None
+        range_match = _PRICE_RANGE_RE.search(user_message)
+        if range_match:
+            min_price, max_price = sorted(map(_parse_price, range_match.groups()))
+        else:
+            max_match = _MAX_PRICE_RE.search(user_message)
+            min_match = _MIN_PRICE_RE.search(user_message)
+            if max_match:
+                max_price = _parse_price(max_match.group(1) or max_match.group(2))
+                min_price = 0
+            if min_match:
+                min_price = _parse_price(min_match.group(1) or min_match.group(2))
         
-        Return as JSON format:
-        {{
-            "category": "phone/laptop/tablet/None",
-            "min_price": null,
-            "max_price": null,
-            "brand": "brand_name/None",
-            "features": ["feature1", "feature2"],
-            "search_query": "main search terms"
-        }}
-        """
+        return {
+            "category": next(iter(categories), None),
+            "min_price": min_price,
+            "max_price": max_price,
+            "brand": _BRAND_NAMES[next(iter(brands))] if brands else None,
+            "features": [],
+            "search_query": user_message
+        }
+    
+    async def _extract_search_intent(self, user_message: str) -> Dict[str, Any]:
+        """Extract search intent and filters from user message."""
+        # Unambiguous messages skip the LLM round trip entirely
+        intent = self._keyword_intent(user_message)
+        if intent is not None:
+            return intent
         
         try:
-            response = self.llm.invoke([HumanMessage(content=intent_prompt)])
+            response = await self.intent_llm.ainvoke(_INTENT_PROMPT.format_messages(user_message=user_message))
             # Parse the response to extract JSON (simplified for demo)
             # In production, you'd want more robust JSON parsing
             return self._parse_intent_response(response.content)
@@ -119,9 +264,8 @@ class ProductRecommendationChatbot:
                 end = response.rfind("}") + 1
                 json_str = response[start:end]
                 
-                # Simple parsing for demo purposes
-                import json
-                return json.loads(json_str)
+                # orjson parses str input directly, without an encode() copy
+                return orjson.loads(json_str)
         except:
             pass
         
@@ -148,115 +292,169 @@ class ProductRecommendationChatbot:
         if not products:
             return "I couldn't find any products matching your requirements. Could you please provide more details about what you're looking for?"
         
-        response = "Here are some great options for you:\n\n"
+        # Collect the parts and join once instead of re-allocating the string on every +=
+        top_products = products[:3]  # Show top 3
+        parts = ["Here are some great options for you:\n\n"]
         
-        for i, product in enumerate(products[:3], 1):  # Show top 3
-            response += f"**{i}. {product['name']}** (${product['price']})\n"
-            response += f"   Brand: {product['brand']}\n"
-            response += f"   Description: {product['description']}\n"
+        for i, product in enumerate(top_products, 1):
+            parts.append(f"**{i}. {product['name']}** (${product['price']})\n")
+            parts.append(f"   Brand: {product['brand']}\n")
+            parts.append(f"   Description: {product['description']}\n")
             
             # Add key specs
             specs = product['specs']
             if 'screen_size' in specs:
-                response += f"   Screen: {specs['screen_size']}\n"
+                parts.append(f"   Screen: {specs['screen_size']}\n")
             if 'storage' in specs:
-                response += f"   Storage: {specs['storage']}\n"
+                parts.append(f"   Storage: {specs['storage']}\n")
             if 'processor' in specs:
-                response += f"   Processor: {specs['processor']}\n"
+                parts.append(f"   Processor: {specs['processor']}\n")
             
             # Add key features
-            if product['features']:
-                response += f"   Key Features: {', '.join(product['features'][:3])}\n"
+            features = product['features']
+            if features:
+                parts.append(f"   Key Features: {', '.join(features[:3])}\n")
             
-            response += f"   Match Score: {product.get('similarity_score', 0):.2f}\n\n"
+            parts.append(f"   Match Score: {product.get('similarity_score', 0):.2f}\n\n")
         
         if len(products) > 3:
-            response += f"... and {len(products) - 3} more options available.\n\n"
+            parts.append(f"... and {len(products) - 3} more options available.\n\n")
         
-        response += "Would you like me to provide more details about any of these products or help you narrow down your search?"
+        parts.append("Would you like me to provide more details about any of these products or help you narrow down your search?")
+        
+        return "".join(parts)
+    
+    def _create_response_messages(self, user_message: str, products: List[Dict]) -> List[BaseMessage]:
+        """Create the LLM messages that present the found products to the user."""
+        # Create context from found products
+        product_context = "".join(f"- {product['name']}: {product['description']}\n" for product in products[:3])
         
-        return response
+        return _RESPONSE_PROMPT.format_messages(product_context=product_context, user_message=user_message)
     
-    def _generate_contextual_response(self, user_message: str, products: List[Dict]) -> str:
+    async def _generate_contextual_response(self, user_message: str, products: List[Dict]) -> str:
         """Generate a contextual response using the LLM."""
         if not products:
             return "I couldn't find any products matching your requirements. Could you please provide more details about what you're looking for?"
         
-        # Create context from found products
-        product_context = ""
-        for product in products[:3]:
-            product_context += f"- {product['name']}: {product['description']}\n"
-        
-        response_prompt = f"""
-        User is looking for products and you found these options:
-        
-        {product_context}
-        
-        User message: "{user_message}"
-        
-        Provide a helpful, conversational response that:
-        1. Acknowledges their request
-        2. Presents the recommendations naturally
-        3. Asks follow-up questions to help them decide
-        4. Mentions key benefits of the recommended products
-        
-        Be friendly and helpful, as if you're a knowledgeable sales assistant.
-        """
+        response_messages = self._create_response_messages(user_message, products)
         
         try:
-            response = self.llm.invoke([HumanMessage(content=response_prompt)])
+            response = await self.llm.ainvoke(response_messages)
             return response.content
         except Exception as e:
             print(f"Error generating contextual response: {e}")
             return self._format_product_recommendations(products)
     
-    def chat(self, user_message: str) -> str:
+    def _intent_filter(self, intent: Dict[str, Any]) -> Optional[Dict]:
+        """Build the vector search filter for an extracted intent (category or else brand, plus any price bounds)."""
+        filter_dict = {}
+        if intent["category"]:
+            filter_dict["category"] = intent["category"]
+        elif intent["brand"]:
+            filter_dict["brand"] = intent["brand"]
+        
+        # Either bound may be open-ended, e.g. "under $800" or "over $500"; non-numeric LLM output is ignored
+        price = {}
+        if isinstance(intent["min_price"], (int, float)):
+            price["$gte"] = intent["min_price"]
+        if isinstance(intent["max_price"], (int, float)):
+            price["$lte"] = intent["max_price"]
+        if price:
+            filter_dict["price"] = price
+        
+        return filter_dict or None
+    
+    async def _find_products(self, user_message: str, query_embedding: Optional[List[float]] = None) -> List[Dict]:
+        """Extract the search intent from a message and search for matching products."""
+        if query_embedding:
+            intent = await self._extract_search_intent(user_message)
+        else:
+            # Embed the raw message while the intent is being extracted; the intent only adds filters
+            intent, query_embedding = await asyncio.gather(
+                self._extract_search_intent(user_message),
+                self.vector_store.aembed_query(user_message),
+            )
+        if not query_embedding:
+            # Reported as an error, not as "no matches", so the failed turn isn't cached
+            raise RuntimeError("Query embedding failed")
+        
+        return await self.vector_store.asearch_by_embedding(
+            query_embedding,
+            filter_dict=self._intent_filter(intent)
+        )
+    
+    async def achat(self, user_message: str, query_embedding: Optional[List[float]] = None) -> str:
         """
         Main chat method that processes user input and returns a response.
         
         Args:
             user_message: The user's input message
+            query_embedding: Unit-length embedding of the message, if the caller already has one
             
         Returns:
             The chatbot's response
         """
         try:
-            # Extract search intent
-            intent = self._extract_search_intent(user_message)
+            async with _get_chat_slots():
+                products = await self._find_products(user_message, query_embedding)
+                
+                # Generate response
+                if products:
+                    return await self._generate_contextual_response(user_message, products)
+            return NO_RESULTS_RESPONSE
             
-            # Search for products based on intent
-            products = []
-            if intent["category"]:
-                products = self.vector_store.search_by_category(
-                    intent["category"], 
-                    intent["search_query"]
-                )
-            elif intent["brand"]:
-                products = self.vector_store.search_by_brand(
-                    intent["brand"], 
-                    intent["search_query"]
-                )
-            elif intent["min_price"] is not None and intent["max_price"] is not None:
-                products = self.vector_store.search_by_price_range(
-                    intent["min_price"], 
-                    intent["max_price"], 
-                    intent["search_query"]
-                )
-            else:
-                # General search
-                products = self.vector_store.search_products(intent["search_query"])
+        except Exception as e:
+            print(f"Error in chat: {e}")
+            return ERROR_RESPONSE
+    
+    def chat(self, user_message: str, query_embedding: Optional[List[float]] = None) -> str:
+        """Synchronous wrapper around achat() for callers without an event loop."""
+        return run_sync(self.achat(user_message, query_embedding))
+    
+    async def astream_chat(self, user_message: str, query_embedding: Optional[List[float]] = None) -> AsyncIterator[str]:
+        """
+        Streaming variant of achat() that yields the response as the LLM generates it.
+        
+        Args:
+            user_message: The user's input message
+            query_embedding: Unit-length embedding of the message, if the caller already has one
             
-            # Generate response
-            if products:
-                response = self._generate_contextual_response(user_message, products)
-            else:
-                response = "I couldn't find any products matching your requirements. Could you please provide more details about what you're looking for? For example:\n- What type of device (phone, laptop, tablet)?\n- What's your budget range?\n- Any specific features you need?\n- Preferred brand?"
+        Yields:
+            Successive chunks of the chatbot's response, followed by STREAM_INTERRUPTED if
+            the LLM failed after part of the answer was sent
+        """
+        # The slot is held until the stream finishes or the consumer closes it
+        async with _get_chat_slots():
+            try:
+                products = await self._find_products(user_message, query_embedding)
+            except Exception as e:
+                print(f"Error in chat: {e}")
+                yield ERROR_RESPONSE
+                return
             
-            return response
+            if not products:
+                yield NO_RESULTS_RESPONSE
+                return
             
-        except Exception as e:
-            print(f"Error in chat: {e}")
-            return "I'm sorry, I encountered an error while processing your request. Please try again or rephrase your question."
+            response_messages = self._create_response_messages(user_message, products)
+            streamed = False
+            try:
+                async for chunk in self.llm.astream(response_messages):
+                    if chunk.content:
+                        streamed = True
+                        yield chunk.content
+            except Exception as e:
+                print(f"Error generating contextual response: {e}")
+                # Fall back to the static summary unless part of the answer was already sent
+                if streamed:
+                    yield STREAM_INTERRUPTED
+                else:
+                    yield self._format_product_recommendations(products)
+    
+    def chat_stream(self, user_message: str, query_embedding: Optional[List[float]] = None) -> Iterator[str]:
+        """Synchronous wrapper around astream_chat(), e.g. for st.write_stream; may end with STREAM_INTERRUPTED."""
+        # Driven on the shared loop, which the async API clients' connections are bound to
+        yield from iterate_sync(self.astream_chat(user_message, query_embedding))
     
     def get_chat_history(self) -> List[Dict]:
         """Get the conversation history."""
@@ -0,0 +1,107 @@
+"""
+Query embedding cache backed by an in-memory LRU and SQLite.
+Repeated queries skip the embeddings API, and the SQLite file lets other processes reuse them.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+from utils.semantic_cache import normalize_prompt
+
+class EmbeddingCache:
+    def __init__(self, db_path: str = "embedding_cache.db", model: Optional[str] = None,
+                 max_entries: int = 4096, max_rows: int = 100000):
+        """
+        Open (or create) the embedding cache.
+        
+        Args:
+            db_path: Path of the SQLite database file
+            model: Embedding model the vectors come from; other models' rows are never returned
+            max_entries: Maximum number of embeddings kept in memory
+            max_rows: Maximum number of embeddings kept in SQLite, least recently used dropped first
+        """
+        self.db_path = db_path
+        self.model = model or ""
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        # Pruning sorts the table, so it runs once per this many inserts rather than on each one
+        self.prune_every = 256
+        self._puts_since_prune = 0
+        
+        # Normalized text -> embedding, most recently used last
+        self._memory = OrderedDict()
+        
+        # One connection shared by all threads, serialized with a lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        
+        with self._lock, self._conn:
+            # Files written before rows were scoped by model cannot be attributed to one, so start over
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)")}
+            if columns and "model" not in columns:
+                self._conn.execute("DROP TABLE embeddings")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, text TEXT NOT NULL, vector BLOB NOT NULL, used_at REAL NOT NULL, "
+                "PRIMARY KEY (model, text))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_used_at ON embeddings (used_at)")
+            self._prune()
+    
+    def get(self, text: str) -> Optional[List[float]]:
+        """Return the cached embedding for a (normalized) text, if any."""
+        key = normalize_prompt(text)
+        with self._lock:
+            embedding = self._memory.get(key)
+            if embedding is not None:
+                self._memory.move_to_end(key)
+                return embedding
+            
+            row = self._conn.execute(
+                "SELECT vector FROM embeddings WHERE model = ? AND text = ?", (self.model, key)
+            ).fetchone()
+            if row is None:
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE embeddings SET used_at = ? WHERE model = ? AND text = ?", (time.time(), self.model, key)
+                )
+            embedding = np.frombuffer(row[0], dtype=np.float32).tolist()
+            self._remember(key, embedding)
+            return embedding
+    
+    def put(self, text: str, embedding: List[float]):
+        """Store an embedding under the normalized text; empty embeddings are ignored."""
+        if not embedding:
+            return
+        key = normalize_prompt(text)
+        with self._lock, self._conn:
+            self._remember(key, embedding)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (model, text, vector, used_at) VALUES (?, ?, ?, ?)",
+                (self.model, key, np.asarray(embedding, dtype=np.float32).tobytes(), time.time()),
+            )
+            self._puts_since_prune += 1
+            if self._puts_since_prune >= self.prune_every:
+                self._prune()
+    
+    def _remember(self, key: str, embedding: List[float]):
+        """Add an entry to the in-memory LRU; the caller must hold the lock."""
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    def _prune(self):
+        """Drop the least recently used rows beyond max_rows; the caller must hold the lock."""
+        self._puts_since_prune = 0
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN "
+            "(SELECT rowid FROM embeddings ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
@@ -0,0 +1,124 @@
+"""
+Response caching utilities for the chatbot.
+Combines an exact-match LRU cache with a semantic cache keyed by query embeddings.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+import numpy as np
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt into an exact-match cache key."""
+    return prompt.strip().lower()
+
+class SemanticCache:
+    def __init__(self, max_entries: int = 256, similarity_threshold: float = 0.95, ttl_seconds: float = 6 * 60 * 60):
+        """
+        Initialize an empty cache.
+        
+        Args:
+            max_entries: Maximum number of entries kept in each cache
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            ttl_seconds: Age after which entries are evicted
+        """
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        
+        # Exact-match LRU keyed by normalized prompt: key -> (value, timestamp)
+        self._exact = OrderedDict()
+        
+        # Semantic entries: unit-length embeddings with their (value, timestamp)
+        self._embeddings: List[np.ndarray] = []
+        self._entries: List[tuple] = []
+        self._matrix: Optional[np.ndarray] = None
+        
+        # The cache is shared across Streamlit sessions, which run in separate threads
+        self._lock = threading.Lock()
+    
+    def get_exact(self, prompt: str) -> Optional[Any]:
+        """Return the cached value for an identical (normalized) prompt, if any."""
+        key = normalize_prompt(prompt)
+        with self._lock:
+            entry = self._exact.get(key)
+            if entry is None:
+                return None
+            value, timestamp = entry
+            if time.time() - timestamp > self.ttl_seconds:
+                del self._exact[key]
+                return None
+            self._exact.move_to_end(key)
+            return value
+    
+    def get_similar(self, embedding: List[float]) -> Optional[Any]:
+        """Return the cached value whose embedding is most similar to the given one, if close enough."""
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+        
+        with self._lock:
+            self._evict_expired()
+            if not self._entries:
+                return None
+            
+            if self._matrix is None:
+                self._matrix = np.vstack(self._embeddings)
+            
+            similarities = np.dot(self._matrix, query)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.similarity_threshold:
+                return None
+            return self._entries[best][0]
+    
+    def put(self, prompt: Optional[str], embedding: Optional[List[float]], value: Any):
+        """Store a value under the exact prompt key and/or its embedding (either may be None)."""
+        now = time.time()
+        with self._lock:
+            if prompt is not None:
+                key = normalize_prompt(prompt)
+                self._exact[key] = (value, now)
+                self._exact.move_to_end(key)
+                while len(self._exact) > self.max_entries:
+                    self._exact.popitem(last=False)
+            
+            vector = self._normalize(embedding)
+            if vector is not None:
+                self._embeddings.append(vector)
+                self._entries.append((value, now))
+                if len(self._entries) > self.max_entries:
+                    del self._embeddings[0]
+                    del self._entries[0]
+                self._matrix = None
+    
+    def clear(self):
+        """Remove all cached entries."""
+        with self._lock:
+            self._exact.clear()
+            self._embeddings.clear()
+            self._entries.clear()
+            self._matrix = None
+    
+    def _evict_expired(self):
+        """Drop semantic entries older than the TTL (entries are kept in insertion order)."""
+        cutoff = time.time() - self.ttl_seconds
+        expired = 0
+        while expired < len(self._entries) and self._entries[expired][1] < cutoff:
+            expired += 1
+        if expired:
+            del self._embeddings[:expired]
+            del self._entries[:expired]
+            self._matrix = None
+    
+    @staticmethod
+    def _normalize(embedding: Optional[List[float]]) -> Optional[np.ndarray]:
+        """Convert an embedding to a unit-length vector so a dot product gives cosine similarity."""
+        if embedding is None or len(embedding) == 0:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
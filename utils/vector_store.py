@@ -4,11 +4,134 @@ Handles embedding generation, index management, and similarity search.
 """
 
 import os
-import json
-from typing import List, Dict, Any
-from openai import AzureOpenAI
+import hashlib
+import operator
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, NamedTuple, Optional
+import numpy as np
+import orjson
+from openai import APIConnectionError, APITimeoutError, AsyncAzureOpenAI, AzureOpenAI, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 from pinecone import Pinecone, ServerlessSpec
-from data.products import PRODUCTS
+from data.products import PRODUCTS, Product, get_product_by_id
+from utils.async_loop import run_blocking
+from utils.embedding_cache import EmbeddingCache
+from utils.semantic_cache import SemanticCache
+
+try:
+    import faiss
+except ImportError:  # faiss is optional; without it small catalogs use a NumPy index and large ones go to Pinecone
+    faiss = None
+
+# Names of Pinecone indexes already known to exist in this process, so later stores skip list_indexes()
+_READY_INDEXES = set()
+
+# Up to 3 attempts with exponential backoff for transient embedding API failures
+_embedding_retry = retry(
+    retry=retry_if_exception_type((RateLimitError, APITimeoutError, APIConnectionError)),
+    wait=wait_exponential(multiplier=1, max=20),
+    stop=stop_after_attempt(3),
+    reraise=True,
+)
+
+# Pinecone metadata filter operators supported by the local index
+_FILTER_OPERATORS = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+    "$in": lambda value, options: value in options,
+    "$nin": lambda value, options: value not in options,
+}
+
+def _matches_filter(product: Dict[str, Any], filter_dict: Optional[Dict]) -> bool:
+    """Check a product against a Pinecone-style metadata filter."""
+    if not filter_dict:
+        return True
+    for field, condition in filter_dict.items():
+        value = product.get(field)
+        if isinstance(condition, dict):
+            for op, expected in condition.items():
+                if not _FILTER_OPERATORS[op](value, expected):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+def _product_metadata(product: Product, content_hash: str) -> Dict[str, Any]:
+    """
+    Build the Pinecone metadata for a product.
+    
+    Only the fields used in filters are stored; matches are resolved to full products from the
+    local catalog by ID, which keeps query responses small.
+    """
+    return {
+        "id": product.id,
+        "category": product.category,
+        "brand": product.brand,
+        "price": product.price,
+        "content_hash": content_hash
+    }
+
+def _unit_vector(embedding: List[float]) -> List[float]:
+    """Scale an embedding to unit length, so cosine similarity is a plain dot product."""
+    vector = np.asarray(embedding, dtype=np.float32)
+    vector /= np.linalg.norm(vector) + 1e-12
+    return vector.tolist()
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length (zero rows are left as is)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+class _LocalIndex(NamedTuple):
+    """An in-process index with the product ids of its rows, published and read as one unit."""
+    index: Any
+    ids: List[str]
+    exact: bool
+
+class _NumpyFlatIndex:
+    """Minimal exact inner-product index with the same search() interface as faiss.IndexFlatIP."""
+    
+    is_trained = True
+    
+    def __init__(self, dimension: int):
+        self.vectors = np.empty((0, dimension), dtype=np.float32)
+    
+    @property
+    def ntotal(self) -> int:
+        return len(self.vectors)
+    
+    def add(self, vectors: np.ndarray):
+        self.vectors = np.vstack([self.vectors, vectors])
+    
+    def search(self, queries: np.ndarray, k: int):
+        scores = queries @ self.vectors.T
+        k = min(k, self.ntotal)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k] if k else np.empty((len(queries), 0), dtype=np.int64)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(top_scores, order, axis=1), np.take_along_axis(top, order, axis=1)
+
+@lru_cache(maxsize=None)
+def _product_text(product_id: str) -> str:
+    """Render a product's embedding text once; the catalog doesn't change at runtime."""
+    product = get_product_by_id(product_id)
+    return "\n".join([
+        f"Product: {product.name}",
+        f"Category: {product.category}",
+        f"Brand: {product.brand}",
+        f"Price: ${product.price}",
+        f"Description: {product.description}",
+        "Specifications: " + " ".join(f"{k}: {v}" for k, v in product.specs.items()),
+        "Features: " + " ".join(product.features),
+        "Tags: " + " ".join(product.tags),
+    ])
 
 class ProductVectorStore:
     def __init__(self):
@@ -29,80 +152,178 @@ class ProductVectorStore:
             azure_endpoint=os.getenv("AZURE_EMBEDDING_ENDPOINT"),
         )
         
+        # Async client for the chatbot's concurrent pipeline
+        self.async_azure_openai_client = AsyncAzureOpenAI(
+            api_version="2024-07-01-preview",
+            api_key=os.getenv("AZURE_EMBEDDING_API_KEY"),
+            azure_endpoint=os.getenv("AZURE_EMBEDDING_ENDPOINT"),
+        )
+        
+        # Query embeddings persisted across runs, and Pinecone results reused for near-identical queries
+        self.embedding_cache = EmbeddingCache(
+            os.getenv("EMBEDDING_CACHE_DB", "embedding_cache.db"), model=os.getenv("AZURE_EMBEDDING_MODEL")
+        )
+        # One result cache per top_k/filter combination, least recently used dropped first
+        self.result_caches: Dict[bytes, SemanticCache] = OrderedDict()
+        self.max_result_caches = 128
+        self._result_caches_lock = threading.Lock()
+        self.result_similarity_threshold = 0.97
+        
         # Initialize Pinecone
         self.pc = Pinecone(api_key=self.pinecone_api_key)
         
         # Get or create index
         self.index = self._get_or_create_index()
+        
+        # In-process index over the product embeddings, queried before Pinecone. Catalogs up to
+        # local_exact_max_size get an exact float32 flat index that fully replaces Pinecone queries;
+        # larger ones get an approximate, 8-bit quantized HNSW index whose results are used only
+        # when confident enough; filtered queries on it fetch local_filter_overfetch x top_k candidates.
+        # Rebuilds swap in a whole new _LocalIndex, so searches never mix an index with another's ids
+        self.local_index: Optional[_LocalIndex] = None
+        self.local_exact_max_size = 50000
+        self.local_score_threshold = 0.75
+        self.local_filter_overfetch = 10
     
     def _get_or_create_index(self):
-        """Get existing index or create a new one."""
-        if self.index_name not in [index["name"] for index in self.pc.list_indexes()]:
-            self.pc.create_index(
-                name=self.index_name,
-                dimension=1536,
-                spec=ServerlessSpec(cloud="aws", region="us-east-1"),
-            )
-            print(f"Created new Pinecone index: {self.index_name}")
+        """Get existing index or create a new one, then warm up its connection."""
+        if self.index_name not in _READY_INDEXES:
+            if self.index_name not in [index["name"] for index in self.pc.list_indexes()]:
+                self.pc.create_index(
+                    name=self.index_name,
+                    dimension=1536,
+                    metric="dotproduct",
+                    spec=ServerlessSpec(cloud="aws", region="us-east-1"),
+                )
+                print(f"Created new Pinecone index: {self.index_name}")
+            _READY_INDEXES.add(self.index_name)
+        
+        index = self.pc.Index(self.index_name)
+        
+        # A cheap first request opens the TLS connection, so the first real query reuses it
+        try:
+            index.describe_index_stats()
+        except Exception as e:
+            print(f"Error warming up Pinecone index: {e}")
         
-        return self.pc.Index(self.index_name)
+        return index
     
     def _generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for given text using Azure OpenAI."""
+        """Generate embedding for given text using Azure OpenAI, reusing cached embeddings."""
+        cached = self.embedding_cache.get(text)
+        if cached is not None:
+            return cached
+        
         try:
             response = self.azure_openai_client.embeddings.create(
                 model=os.getenv("AZURE_EMBEDDING_MODEL"),
                 input=text
             )
-            return response.data[0].embedding
+            embedding = _unit_vector(response.data[0].embedding)
+        except Exception as e:
+            print(f"Error generating embedding: {e}")
+            return []
+        
+        self.embedding_cache.put(text, embedding)
+        return embedding
+    
+    @_embedding_retry
+    def _create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of texts in a single API request, retrying transient failures."""
+        response = self.azure_openai_client.embeddings.create(
+            model=os.getenv("AZURE_EMBEDDING_MODEL"),
+            input=texts
+        )
+        return [_unit_vector(item.embedding) for item in sorted(response.data, key=lambda item: item.index)]
+    
+    def _embed_batch_or_empty(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch, giving every text an empty embedding if the request ultimately fails."""
+        try:
+            return self._create_embeddings(texts)
+        except Exception as e:
+            print(f"Error generating embeddings: {e}")
+            return [[] for _ in texts]
+    
+    def _generate_embeddings_batch(self, texts: List[str], batch_size: int = 96, max_workers: int = 10) -> List[List[float]]:
+        """
+        Generate embeddings for many texts, sending up to max_workers batch requests concurrently.
+        
+        Returns:
+            One embedding per text, in order; texts whose batch failed get an empty list
+        """
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        if len(batches) <= 1:
+            return self._embed_batch_or_empty(batches[0]) if batches else []
+        
+        # executor.map yields results in submission order, so batches stay aligned with texts
+        embeddings = []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            for batch_embeddings in executor.map(self._embed_batch_or_empty, batches):
+                embeddings.extend(batch_embeddings)
+        return embeddings
+    
+    async def _agenerate_embedding(self, text: str) -> List[float]:
+        """Async variant of _generate_embedding."""
+        cached = self.embedding_cache.get(text)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self.async_azure_openai_client.embeddings.create(
+                model=os.getenv("AZURE_EMBEDDING_MODEL"),
+                input=text
+            )
+            embedding = _unit_vector(response.data[0].embedding)
         except Exception as e:
             print(f"Error generating embedding: {e}")
             return []
+        
+        self.embedding_cache.put(text, embedding)
+        return embedding
+    
+    async def aembed_query(self, query: str) -> List[float]:
+        """Embed a search query without blocking the event loop."""
+        return await self._agenerate_embedding(query)
     
-    def _create_product_text(self, product: Dict[str, Any]) -> str:
+    def _create_product_text(self, product: Product) -> str:
         """Create a comprehensive text representation of a product for embedding."""
-        specs_text = " ".join([f"{k}: {v}" for k, v in product["specs"].items()])
-        features_text = " ".join(product["features"])
-        tags_text = " ".join(product["tags"])
-        
-        return f"""
-        Product: {product['name']}
-        Category: {product['category']}
-        Brand: {product['brand']}
-        Price: ${product['price']}
-        Description: {product['description']}
-        Specifications: {specs_text}
-        Features: {features_text}
-        Tags: {tags_text}
-        """.strip()
+        return _product_text(product.id)
     
     def populate_index(self):
-        """Populate the Pinecone index with product embeddings."""
+        """Populate the Pinecone index with product embeddings, skipping products that haven't changed."""
         print("Populating Pinecone index with product data...")
         
+        product_texts = [self._create_product_text(product) for product in PRODUCTS]
+        content_hashes = [hashlib.blake2b(text.encode(), digest_size=16).hexdigest() for text in product_texts]
+        
+        # A product whose stored vector was built from identical text doesn't need re-embedding
+        try:
+            stored = self._fetch_stored_vectors()
+        except Exception as e:
+            print(f"Error fetching stored vectors: {e}")
+            stored = {}
+        changed = [
+            i for i, (product, content_hash) in enumerate(zip(PRODUCTS, content_hashes))
+            if product.id not in stored or (stored[product.id].metadata or {}).get("content_hash") != content_hash
+        ]
+        
+        # Embed the changed product texts in batched requests rather than one request per product
+        embeddings = self._generate_embeddings_batch([product_texts[i] for i in changed])
+        
         vectors = []
-        for product in PRODUCTS:
-            # Create text representation
-            product_text = self._create_product_text(product)
-            
-            # Generate embedding
-            embedding = self._generate_embedding(product_text)
-            
+        for i, embedding in zip(changed, embeddings):
             if embedding:
-                # Create metadata
-                metadata = {
-                    "id": product["id"],
-                    "name": product["name"],
-                    "category": product["category"],
-                    "brand": product["brand"],
-                    "price": product["price"],
-                    "description": product["description"],
-                    "specs": json.dumps(product["specs"]),
-                    "features": json.dumps(product["features"]),
-                    "tags": json.dumps(product["tags"])
-                }
-                
-                vectors.append((product["id"], embedding, metadata))
+                vectors.append((PRODUCTS[i].id, embedding, _product_metadata(PRODUCTS[i], content_hashes[i])))
+        embedded_count = len(vectors)
+        
+        # Unchanged vectors written by older versions carry the whole product record as metadata;
+        # re-upsert their stored values with the slim metadata instead of re-embedding them
+        changed_ids = {PRODUCTS[i].id for i in changed}
+        for product, content_hash in zip(PRODUCTS, content_hashes):
+            if product.id in stored and product.id not in changed_ids:
+                metadata = _product_metadata(product, content_hash)
+                if stored[product.id].metadata != metadata:
+                    vectors.append((product.id, stored[product.id].values, metadata))
         
         # Upsert vectors in batches
         batch_size = 100
@@ -110,57 +331,249 @@ class ProductVectorStore:
             batch = vectors[i:i + batch_size]
             self.index.upsert(vectors=batch)
         
-        print(f"Successfully populated index with {len(vectors)} products")
+        # The local index covers both the unchanged stored vectors and the new ones
+        new_embeddings = {vector_id: embedding for vector_id, embedding, _ in vectors}
+        ids, local_embeddings = [], []
+        for product in PRODUCTS:
+            if product.id in new_embeddings:
+                ids.append(product.id)
+                local_embeddings.append(new_embeddings[product.id])
+            elif product.id in stored:
+                ids.append(product.id)
+                local_embeddings.append(stored[product.id].values)
+        self._set_local_index(ids, local_embeddings)
+        
+        # Cached Pinecone results may predate the new vectors
+        if vectors:
+            with self._result_caches_lock:
+                self.result_caches.clear()
+        
+        print(f"Successfully populated index: {embedded_count} products embedded, {len(PRODUCTS) - len(changed)} unchanged")
     
-    def search_products(self, query: str, top_k: int = 5, filter_dict: Dict = None) -> List[Dict]:
+    def _fetch_stored_vectors(self) -> Dict[str, Any]:
+        """Fetch the catalog's stored vectors (values and metadata) from Pinecone, keyed by product ID."""
+        stored = {}
+        product_ids = [product.id for product in PRODUCTS]
+        batch_size = 1000
+        for i in range(0, len(product_ids), batch_size):
+            response = self.index.fetch(ids=product_ids[i:i + batch_size])
+            stored.update(response.vectors)
+        return stored
+    
+    def build_local_index(self) -> bool:
         """
-        Search for products based on query and optional filters.
+        Build the in-process index from the product embeddings stored in Pinecone.
+        
+        Returns:
+            True if a local index is available afterwards
+        """
+        if faiss is None and len(PRODUCTS) > self.local_exact_max_size:
+            return False
+        
+        try:
+            stored = self._fetch_stored_vectors()
+        except Exception as e:
+            print(f"Error building local index: {e}")
+            return False
+        
+        self._set_local_index(list(stored), [vector.values for vector in stored.values()])
+        return self.local_index is not None
+    
+    def _set_local_index(self, ids: List[str], embeddings: List[List[float]]):
+        """Replace the local index with the given product embeddings."""
+        if not embeddings:
+            return
+        
+        # Vectors stored by older versions may not be unit length, so normalize once at build time
+        vectors = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        # The exact index keeps full float32 vectors so its ranking matches Pinecone's; the
+        # approximate one stores 8-bit scalar-quantized codes (4x smaller than float32)
+        dimension = vectors.shape[1]
+        exact = len(ids) <= self.local_exact_max_size
+        if exact:
+            index = faiss.IndexFlatIP(dimension) if faiss is not None else _NumpyFlatIndex(dimension)
+        elif faiss is not None:
+            index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_8bit, 32, faiss.METRIC_INNER_PRODUCT)
+        else:
+            return
+        if not index.is_trained:
+            index.train(vectors)
+        index.add(vectors)
+        
+        self.local_index = _LocalIndex(index, ids, exact)
+    
+    def local_search(self, query_embedding: List[float], top_k: int = 5, filter_dict: Dict = None) -> List[Dict]:
+        """
+        Search the in-process index, applying filters locally.
         
         Args:
-            query: Search query text
+            query_embedding: Embedding of the search query
+            top_k: Number of results to return
+            filter_dict: Optional Pinecone-style filters
+        
+        Returns:
+            List of product dictionaries with similarity scores, best first
+        """
+        return self._search_local(self.local_index, query_embedding, top_k, filter_dict)
+    
+    def _search_local(self, local: Optional[_LocalIndex], query_embedding: List[float], top_k: int, filter_dict: Optional[Dict]) -> List[Dict]:
+        """Search one local index snapshot, applying filters locally."""
+        if local is None:
+            return []
+        
+        # Query embeddings are unit length already, so inner product is the cosine score
+        query = np.asarray([query_embedding], dtype=np.float32)
+        
+        # A filtered query on the exact index ranks the whole (bounded) catalog so no match is missed;
+        # the approximate index over-fetches instead, as asking HNSW for every vector walks the whole graph
+        if not filter_dict:
+            search_k = top_k
+        elif local.exact:
+            search_k = local.index.ntotal
+        else:
+            search_k = top_k * self.local_filter_overfetch
+        search_k = min(search_k, local.index.ntotal)
+        scores, indices = local.index.search(query, search_k)
+        
+        products = []
+        for score, idx in zip(scores[0], indices[0]):
+            if idx < 0:
+                continue
+            product = get_product_by_id(local.ids[idx])
+            if product is None:
+                continue
+            product = product.to_dict()
+            if not _matches_filter(product, filter_dict):
+                continue
+            product["similarity_score"] = float(score)
+            products.append(product)
+            if len(products) == top_k:
+                break
+        
+        return products
+    
+    def _confident_local_results(self, query_embedding: List[float], top_k: int, filter_dict: Optional[Dict]) -> Optional[List[Dict]]:
+        """Get local index results if they can stand in for a Pinecone query, else None."""
+        local = self.local_index
+        if local is None:
+            return None
+        products = self._search_local(local, query_embedding, top_k, filter_dict)
+        
+        # An exact float32 index over the whole catalog returns what Pinecone would; approximate results
+        # are only trusted when the best match is confident
+        if local.exact:
+            return products
+        if filter_dict and len(products) < top_k:
+            # The over-fetched candidates may have missed matches that pass the filter
+            return None
+        if products and products[0]["similarity_score"] >= self.local_score_threshold:
+            return products
+        return None
+    
+    def _result_cache(self, top_k: int, filter_dict: Optional[Dict]) -> SemanticCache:
+        """Get the Pinecone result cache for a top_k/filter combination."""
+        # Sorted keys make equivalent filters share a cache; the bytes are used as the key directly
+        key = orjson.dumps([top_k, filter_dict], option=orjson.OPT_SORT_KEYS)
+        with self._result_caches_lock:
+            cache = self.result_caches.get(key)
+            if cache is None:
+                cache = SemanticCache(max_entries=256, similarity_threshold=self.result_similarity_threshold, ttl_seconds=60 * 60)
+                self.result_caches[key] = cache
+                while len(self.result_caches) > self.max_result_caches:
+                    self.result_caches.popitem(last=False)
+            else:
+                self.result_caches.move_to_end(key)
+        return cache
+    
+    def _query_pinecone(self, query_embedding: List[float], top_k: int, filter_dict: Optional[Dict]) -> List[Dict]:
+        """Run a similarity query against Pinecone, reusing results for near-identical query embeddings."""
+        cache = self._result_cache(top_k, filter_dict)
+        cached = cache.get_similar(query_embedding)
+        if cached is not None:
+            return list(cached)
+        
+        products = self._fetch_from_pinecone(query_embedding, top_k, filter_dict)
+        if products:
+            cache.put(None, query_embedding, products)
+        return products
+    
+    def _fetch_from_pinecone(self, query_embedding: List[float], top_k: int, filter_dict: Optional[Dict]) -> List[Dict]:
+        """
+        Query Pinecone and convert the matches to product dictionaries.
+        
+        Errors are raised rather than returned as an empty list, so callers can tell a failed
+        search from one without matches.
+        """
+        results = self.index.query(
+            vector=query_embedding,
+            top_k=top_k,
+            filter=filter_dict,
+            include_metadata=False
+        )
+        
+        # Resolve matches to full product records from the local catalog
+        products = []
+        for match in results.matches:
+            product = get_product_by_id(match.id)
+            if product is None:
+                continue
+            product = product.to_dict()
+            product["similarity_score"] = match.score
+            products.append(product)
+        
+        return products
+    
+    def search_by_embedding(self, query_embedding: List[float], top_k: int = 5, filter_dict: Dict = None) -> List[Dict]:
+        """
+        Search for products similar to an already-computed query embedding.
+        
+        Args:
+            query_embedding: Embedding of the search query
             top_k: Number of results to return
             filter_dict: Optional filters (e.g., {"category": "phone", "price": {"$lte": 1000}})
         
         Returns:
             List of product dictionaries with similarity scores
-        """
-        # Generate embedding for query
-        query_embedding = self._generate_embedding(query)
         
+        Raises:
+            Exception: If the Pinecone query fails
+        """
         if not query_embedding:
             return []
         
-        # Perform similarity search
-        try:
-            results = self.index.query(
-                vector=query_embedding,
-                top_k=top_k,
-                filter=filter_dict,
-                include_metadata=True
-            )
-            
-            # Format results
-            products = []
-            for match in results.matches:
-                product = {
-                    "id": match.metadata["id"],
-                    "name": match.metadata["name"],
-                    "category": match.metadata["category"],
-                    "brand": match.metadata["brand"],
-                    "price": match.metadata["price"],
-                    "description": match.metadata["description"],
-                    "specs": json.loads(match.metadata["specs"]),
-                    "features": json.loads(match.metadata["features"]),
-                    "tags": json.loads(match.metadata["tags"]),
-                    "similarity_score": match.score
-                }
-                products.append(product)
-            
+        # Serve confident matches from the local index without a network round trip
+        products = self._confident_local_results(query_embedding, top_k, filter_dict)
+        if products is not None:
             return products
-            
-        except Exception as e:
-            print(f"Error searching products: {e}")
+        return self._query_pinecone(query_embedding, top_k, filter_dict)
+    
+    async def asearch_by_embedding(self, query_embedding: List[float], top_k: int = 5, filter_dict: Dict = None) -> List[Dict]:
+        """Async variant of search_by_embedding; the (synchronous) Pinecone query runs in a worker thread."""
+        if not query_embedding:
             return []
+        
+        products = self._confident_local_results(query_embedding, top_k, filter_dict)
+        if products is not None:
+            return products
+        return await run_blocking(self._query_pinecone, query_embedding, top_k, filter_dict)
+    
+    def search_products(self, query: str, top_k: int = 5, filter_dict: Dict = None) -> List[Dict]:
+        """
+        Search for products based on query and optional filters.
+        
+        Args:
+            query: Search query text
+            top_k: Number of results to return
+            filter_dict: Optional filters (e.g., {"category": "phone", "price": {"$lte": 1000}})
+        
+        Returns:
+            List of product dictionaries with similarity scores
+        """
+        return self.search_by_embedding(self._generate_embedding(query), top_k, filter_dict)
+    
+    async def asearch_products(self, query: str, top_k: int = 5, filter_dict: Dict = None) -> List[Dict]:
+        """Async variant of search_products."""
+        return await self.asearch_by_embedding(await self.aembed_query(query), top_k, filter_dict)
     
     def search_by_category(self, category: str, query: str = "", top_k: int = 5) -> List[Dict]:
         """Search for products within a specific category."""
@@ -194,3 +607,8 @@ class ProductVectorStore:
         except Exception as e:
             print(f"Error getting index stats: {e}")
             return {}
+
+@lru_cache(maxsize=1)
+def get_vector_store() -> ProductVectorStore:
+    """Get the vector store shared by the whole process, so its API clients and connection pools are reused."""
+    return ProductVectorStore()